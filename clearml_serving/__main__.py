@@ -222,6 +222,7 @@ def func_model_auto_update_add(args):
             output_type=args.output_type,
             output_name=args.output_name,
             auxiliary_cfg=aux_config,
+            grpc_compression=args.grpc_compression,
         ),
         preprocess_code=args.preprocess
     ):
@@ -259,6 +260,7 @@ def func_model_endpoint_add(args):
             output_type=args.output_type,
             output_name=args.output_name,
             auxiliary_cfg=aux_config,
+            grpc_compression=args.grpc_compression,
         ),
         preprocess_code=args.preprocess,
         model_name=args.name,
@@ -464,6 +466,10 @@ def cli():
         '--output-name', type=str,
         help='Optional: Specify the model layer pulling results from, examples: layer_99'
     )
+    parser_model_monitor.add_argument(
+        '--grpc-compression', type=str, choices=['gzip', 'deflate'], default=None,
+        help='Optional: Triton engine, compress the gRPC inference requests (default: no compression)'
+    )
     parser_model_monitor.add_argument(
         '--aux-config', type=int, nargs='+',
         help='Specify additional engine specific auxiliary configuration in the form of key=value. '
@@ -513,6 +519,10 @@ def cli():
         '--output-name', type=str,
         help='Optional: Specify the model layer pulling results from, examples: layer_99'
     )
+    parser_model_add.add_argument(
+        '--grpc-compression', type=str, choices=['gzip', 'deflate'], default=None,
+        help='Optional: Triton engine, compress the gRPC inference requests (default: no compression)'
+    )
     parser_model_add.add_argument(
         '--aux-config', type=int, nargs='+',
         help='Specify additional engine specific auxiliary configuration in the form of key=value. '
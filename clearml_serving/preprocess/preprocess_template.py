@@ -40,6 +40,8 @@ class Preprocess(object):
             >>>   collect_custom_statistics_fn({"x0": 1, "x1": 2})
 
         :return: Object to be passed directly to the model inference
+            Notice: for the Triton engine, returning a C-contiguous numpy matrix of the endpoint input type
+            (e.g. float32) avoids an additional dtype / memory layout conversion copy of the data
         """
         return body
 
@@ -49,6 +51,8 @@ class Preprocess(object):
         returned dict will be passed back as the request result as is.
 
         :param data: object as recieved from the inference model function
+            Notice: for the Triton engine, the returned numpy matrices are read-only (zero-copy) views
+            of the inference response, use `data.copy()` before modifying them in place
         :param collect_custom_statistics_fn: Optional, if provided allows to send a custom set of key/values
             to the statictics collector servicd.
             None is passed if statiscs collector is not configured, or if the current request should not be collected
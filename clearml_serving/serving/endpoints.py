@@ -39,6 +39,8 @@ class ModelMonitoring(BaseStruct):
     preprocess_artifact = attrib(
         type=str, default=None)  # optional artifact name storing the model preprocessing code
     auxiliary_cfg = attrib(type=dict, default=None)  # Auxiliary configuration (e.g. triton conf), Union[str, dict]
+    grpc_compression = attrib(
+        type=str, default=None, validator=validators.optional(validators.in_(("gzip", "deflate"))))  # optional, triton
 
 
 @attrs
@@ -56,6 +58,8 @@ class ModelEndpoint(BaseStruct):
     output_type = attrib(type=str, default=None, validator=_matrix_type_validator)  # optional, model matrix type
     output_name = attrib(type=str, default=None)  # optional, layer name to pull the results from
     auxiliary_cfg = attrib(type=dict, default=None)  # Optional: Auxiliary configuration (e.g. triton conf), [str, dict]
+    grpc_compression = attrib(
+        type=str, default=None, validator=validators.optional(validators.in_(("gzip", "deflate"))))  # optional, triton
 
 
 @attrs
@@ -29,6 +29,10 @@ echo UVICORN_SERVE_LOOP="$UVICORN_SERVE_LOOP"
 echo UVICORN_EXTRA_ARGS="$UVICORN_EXTRA_ARGS"
 echo CLEARML_DEFAULT_BASE_SERVE_URL="$CLEARML_DEFAULT_BASE_SERVE_URL"
 echo CLEARML_DEFAULT_TRITON_GRPC_ADDR="$CLEARML_DEFAULT_TRITON_GRPC_ADDR"
+echo CLEARML_TRITON_BATCH_MAX_SIZE="$CLEARML_TRITON_BATCH_MAX_SIZE"
+echo CLEARML_TRITON_BATCH_MAX_WAIT_MS="$CLEARML_TRITON_BATCH_MAX_WAIT_MS"
+echo CLEARML_SERVING_BATCH_MAX_SIZE="$CLEARML_SERVING_BATCH_MAX_SIZE"
+echo CLEARML_SERVING_BATCH_MAX_WAIT_MS="$CLEARML_SERVING_BATCH_MAX_WAIT_MS"
 
 # runtime add extra python packages
 if [ ! -z "$EXTRA_PYTHON_PACKAGES" ]
@@ -608,7 +608,8 @@ class ModelRequestProcessor(object):
                     input_size=model.input_size,
                     input_type=model.input_type,
                     output_size=model.output_size,
-                    output_type=model.output_type
+                    output_type=model.output_type,
+                    grpc_compression=model.grpc_compression,
                 )
                 self._model_monitoring_endpoints[url] = ep
                 dirty = True
@@ -747,6 +748,7 @@ class ModelRequestProcessor(object):
         self._task.mark_started(force=True)
         self._report_text("Launching - configuration sync every {} sec".format(poll_frequency_sec))
         cleanup = False
+        evicted_processors = []
         self._update_serving_plot()
         while True:
             try:
@@ -770,13 +772,20 @@ class ModelRequestProcessor(object):
                 print("Exception occurred in monitoring thread: {}".format(ex))
             sleep(poll_frequency_sec)
             try:
+                # processors evicted on the previous round, by now all their requests already returned
+                to_close, evicted_processors = evicted_processors, []
+                for processor in to_close:
+                    processor.close()
                 # we assume that by now all old deleted endpoints requests already returned
                 if cleanup:
                     cleanup = False
                     for k in list(self._engine_processor_lookup.keys()):
-                        if k not in self._endpoints:
+                        if k not in self._endpoints and k not in self._model_monitoring_endpoints:
                             # atomic
-                            self._engine_processor_lookup.pop(k, None)
+                            processor = self._engine_processor_lookup.pop(k, None)
+                            if processor:
+                                # requests might still be using it, close on the next round
+                                evicted_processors.append(processor)
             except Exception as ex:
                 print("Exception occurred in monitoring thread: {}".format(ex))
 
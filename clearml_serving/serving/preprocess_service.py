@@ -1,21 +1,197 @@
+import hashlib
+import json
+import mmap
 import os
+import zipfile
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Lock, Thread
+from time import time
 from typing import Optional, Any, Callable, List
 
 import numpy as np
 from clearml import Task, Model
-from clearml.binding.artifacts import Artifacts
-from clearml.storage.util import sha256sum
-from requests import post as request_post
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
 
 from .endpoints import ModelEndpoint
 
+try:
+    # HTTP/2 capable client (requires `httpx[http2]`), fallback to the `requests` Session if not installed
+    import h2  # noqa
+    import httpx  # noqa
+except ImportError:
+    httpx = None
+
+try:
+    # faster json serialization, fallback to the standard json module if not installed
+    import orjson  # noqa
+except ImportError:
+    orjson = None
+
+
+class _BatchQueue(object):
+    def __init__(
+            self,
+            process_batch_fn: Callable[[List[Any]], List[Any]],
+            max_batch: int,
+            max_wait_ms: float,
+            timeout: Optional[float] = None,
+    ):
+        """
+        Collect concurrent requests (up to `max_batch` items or `max_wait_ms` milliseconds)
+        and process them with a single `process_batch_fn` call from a background thread.
+
+        :param process_batch_fn: Function receiving a list of inputs, returning a list of results (same order)
+        :param max_batch: Maximum number of requests to process in a single batch
+        :param max_wait_ms: Maximum time (milliseconds) to wait for more requests before processing a batch
+        :param timeout: Maximum time (seconds) a request waits for its result, None means wait forever
+        """
+        self._process_batch_fn = process_batch_fn
+        self._max_batch = max(1, int(max_batch))
+        self._max_wait_sec = max(0., float(max_wait_ms)) / 1000.
+        self._timeout = timeout
+        self._queue = Queue()
+        self._closed = False
+        # guards `_closed` and the queue, so that no request is pushed after the stop sentinel
+        self._lock = Lock()
+        self._thread = Thread(target=self._daemon, daemon=True)
+        self._thread.start()
+
+    def submit(self, data: Any) -> Any:
+        """
+        Push a single request into the batch queue, and wait for its result (blocking)
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise ValueError("Batch queue is closed")
+            self._queue.put((data, future))
+        return future.result(timeout=self._timeout)
+
+    def close(self) -> None:
+        """
+        Stop the background thread, requests already in the queue are processed before it returns
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # sentinel
+            self._queue.put(None)
+        self._thread.join(timeout=self._timeout)
+
+    def _daemon(self) -> None:
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time() + self._max_wait_sec
+            while len(batch) < self._max_batch:
+                timeout = deadline - time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            try:
+                results = self._process_batch_fn([data for data, _ in batch])
+            except Exception as ex:
+                for _, future in batch:
+                    future.set_exception(ex)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+        # nothing should be left after the sentinel, but never leave a request waiting forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                item[1].set_exception(ValueError("Batch queue is closed"))
+
+
+class _BatchRunner(object):
+    """
+    Mixin for engines running `self._model.predict()` in process.
+    Concurrent requests are stacked (rows) into a single `predict` call and the results split back per request.
+    Only 2D numeric numpy matrices with the model's number of features (columns) are batched,
+    anything else is predicted on its own. Default batch size 1 means disabled
+    """
+    _batch_max_size = int(os.environ.get("CLEARML_SERVING_BATCH_MAX_SIZE", 1))
+    _batch_max_wait_ms = float(os.environ.get("CLEARML_SERVING_BATCH_MAX_WAIT_MS", 2))
+    _batch_queue = None
+    _batch_num_features = None
+
+    def _init_batch_runner(self) -> None:
+        if self._batch_max_size <= 1:
+            return
+        self._batch_num_features = self._get_num_features()
+        # unknown number of columns, we cannot safely stack requests
+        if not self._batch_num_features:
+            return
+        self._batch_queue = _BatchQueue(
+            self._predict_batch, max_batch=self._batch_max_size, max_wait_ms=self._batch_max_wait_ms)
+
+    def close(self) -> None:
+        if self._batch_queue is not None:
+            self._batch_queue.close()
+        super(_BatchRunner, self).close()
+
+    def _get_num_features(self) -> Optional[int]:
+        num_features = getattr(self._model, "n_features_in_", None)
+        if not num_features and self.model_endpoint.input_size:
+            num_features = self.model_endpoint.input_size[-1]
+        return num_features if num_features and num_features > 0 else None
+
+    def _batch_predict(self, data: Any) -> Any:
+        # checked here (not in the batch thread), so that a bad input only fails its own request
+        if self._batch_queue is None or not isinstance(data, np.ndarray) or data.ndim != 2 or \
+                data.dtype.kind not in "biuf" or data.shape[1] != self._batch_num_features:
+            return self._predict(data)
+        return self._batch_queue.submit(data)
+
+    def _predict_batch(self, batch: List[np.ndarray]) -> List[Any]:
+        if len(batch) == 1:
+            return [self._predict(batch[0])]
+        results = np.asarray(self._predict(np.vstack(batch)))
+        return np.split(results, np.cumsum([len(d) for d in batch[:-1]]), axis=0)
+
+    def _predict(self, data: Any) -> Any:
+        return self._model.predict(data)
+
 
 class BasePreprocessRequest(object):
     __preprocessing_lookup = {}
     __preprocessing_modules = set()
     _default_serving_base_url = "http://127.0.0.1:8080/serve/"
     _server_config = {}  # externally configured by the serving inference service
+    _cached_base_url = _default_serving_base_url.strip("/")  # updated with `set_server_config`
     _timeout = None  # timeout in seconds for the entire request, set in __init__
+    # shared connection pool for outbound serving requests (see `send_request`), only one of them is created
+    # notice HTTP/2 is only negotiated (ALPN) with https:// serving urls, otherwise httpx uses HTTP/1.1 keep-alive
+    if httpx:
+        _http_client = httpx.Client(
+            http2=True, follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256))
+        _session = None
+    else:
+        _http_client = None
+        _session = Session()
+        _session.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=128, max_retries=0))
+        _session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=128, max_retries=0))
 
     def __init__(
             self,
@@ -29,6 +205,10 @@ class BasePreprocessRequest(object):
         self.model_endpoint = model_endpoint
         self._preprocess = None
         self._model = None
+        # cached bound methods of the custom preprocess class (None if not implemented)
+        self._pre_fn = None
+        self._post_fn = None
+        self._proc_fn = None
         if self._timeout is None:
             self._timeout = int(float(os.environ.get('GUNICORN_SERVING_TIMEOUT', 600)) * 0.8)
 
@@ -45,20 +225,21 @@ class BasePreprocessRequest(object):
                         self.model_endpoint.preprocess_artifact, ex))
 
     def _instantiate_custom_preprocess_cls(self, task: Task) -> None:
-        path = task.artifacts[self.model_endpoint.preprocess_artifact].get_local_copy()
+        artifact = task.artifacts[self.model_endpoint.preprocess_artifact]
+        # do not extract, we need to hash the artifact file itself (the archive)
+        path = artifact.get_local_copy(extract_archive=False)
         # check file content hash, should only happens once?!
-        # noinspection PyProtectedMember
-        file_hash, _ = sha256sum(path, block_size=Artifacts._hash_block_size)
-        if file_hash != task.artifacts[self.model_endpoint.preprocess_artifact].hash:
+        file_hash = self._get_file_hash(path)
+        if file_hash != artifact.hash:
             print("INFO: re-downloading artifact '{}' hash changed".format(
                 self.model_endpoint.preprocess_artifact))
-            path = task.artifacts[self.model_endpoint.preprocess_artifact].get_local_copy(
+            path = artifact.get_local_copy(
                 extract_archive=True,
                 force_download=True,
             )
-        else:
+        elif os.path.isfile(path) and zipfile.is_zipfile(path):
             # extract zip if we need to, otherwise it will be the same
-            path = task.artifacts[self.model_endpoint.preprocess_artifact].get_local_copy(
+            path = artifact.get_local_copy(
                 extract_archive=True,
             )
 
@@ -71,10 +252,62 @@ class BasePreprocessRequest(object):
         Preprocess.send_request = BasePreprocessRequest._preprocess_send_request
         # create preprocess class
         self._preprocess = Preprocess()
+        self._pre_fn = getattr(self._preprocess, 'preprocess', None)
+        self._post_fn = getattr(self._preprocess, 'postprocess', None)
+        self._proc_fn = getattr(self._preprocess, 'process', None)
         # custom model load callback function
         if callable(getattr(self._preprocess, 'load', None)):
             self._model = self._preprocess.load(self._get_local_model_file())
 
+    @staticmethod
+    def _get_file_hash(path: str) -> Optional[str]:
+        """
+        Return the sha256 of a local file, cached in a sidecar file (`<path>.cbhash`).
+        The cached hash is used as long as the file size and modification time did not change.
+
+        :param path: local file path
+        :return: sha256 hex digest of the file content, None if the file could not be read
+        """
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        cache_file = path + ".cbhash"
+        try:
+            with open(cache_file, "rt") as f:
+                cached = json.load(f)
+            if cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns \
+                    and cached.get("sha256"):
+                return cached["sha256"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        try:
+            with open(path, "rb") as f:
+                if hasattr(hashlib, "file_digest"):
+                    # python 3.11+ zero-copy read loop
+                    file_hash = hashlib.file_digest(f, "sha256").hexdigest()
+                elif stat.st_size:
+                    # hash the memory mapped file in a single (OpenSSL accelerated) call
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        file_hash = hashlib.sha256(mm).hexdigest()
+                else:
+                    # empty files cannot be memory mapped
+                    file_hash = hashlib.sha256().hexdigest()
+        except (OSError, ValueError):
+            # e.g. a folder (extracted archive), the caller will re-download the artifact
+            return None
+
+        # store atomically, multiple processes might be loading the same artifact
+        try:
+            temp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+            with open(temp_file, "wt") as f:
+                json.dump(dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=file_hash), f)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+        return file_hash
+
     def preprocess(self, request: dict, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Optional[Any]:
         """
         Raise exception to report an error
@@ -91,9 +324,7 @@ class BasePreprocessRequest(object):
 
         :return: Object to be passed directly to the model inference
         """
-        if self._preprocess is not None and hasattr(self._preprocess, 'preprocess'):
-            return self._preprocess.preprocess(request, collect_custom_statistics_fn)
-        return request
+        return self._pre_fn(request, collect_custom_statistics_fn) if self._pre_fn else request
 
     def postprocess(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Optional[dict]:
         """
@@ -109,9 +340,7 @@ class BasePreprocessRequest(object):
 
         :return: Dictionary passed directly as the returned result of the RestAPI
         """
-        if self._preprocess is not None and hasattr(self._preprocess, 'postprocess'):
-            return self._preprocess.postprocess(data, collect_custom_statistics_fn)
-        return data
+        return self._post_fn(data, collect_custom_statistics_fn) if self._post_fn else data
 
     def process(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Any:
         """
@@ -128,6 +357,13 @@ class BasePreprocessRequest(object):
         """
         pass
 
+    def close(self) -> None:
+        """
+        Release any resources held by the processor (e.g. connections, background threads).
+        Called once the endpoint processor is removed from the serving service, it will not be used afterwards
+        """
+        pass
+
     def _get_local_model_file(self):
         model_repo_object = Model(model_id=self.model_endpoint.model_id)
         return model_repo_object.get_local_copy()
@@ -135,6 +371,8 @@ class BasePreprocessRequest(object):
     @classmethod
     def set_server_config(cls, server_config: dict) -> None:
         cls._server_config = server_config
+        cls._cached_base_url = (
+            server_config.get("serving_base_url") or cls._default_serving_base_url).strip("/")
 
     @classmethod
     def get_server_config(cls) -> dict:
@@ -176,29 +414,34 @@ class BasePreprocessRequest(object):
     @staticmethod
     def _preprocess_send_request(self, endpoint: str, version: str = None, data: dict = None) -> Optional[dict]:
         endpoint = "{}/{}".format(endpoint.strip("/"), version.strip("/")) if version else endpoint.strip("/")
-        base_url = BasePreprocessRequest.get_server_config().get("base_serving_url")
-        base_url = (base_url or BasePreprocessRequest._default_serving_base_url).strip("/")
-        url = "{}/{}".format(base_url, endpoint.strip("/"))
-        return_value = request_post(url, json=data, timeout=BasePreprocessRequest._timeout)
-        if not return_value.ok:
+        url = "{}/{}".format(BasePreprocessRequest._cached_base_url, endpoint.strip("/"))
+        body = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) if orjson else json.dumps(data).encode("utf-8")
+        headers = {"content-type": "application/json"}
+        if BasePreprocessRequest._http_client is not None:
+            # keep raising `requests` exceptions, user preprocess code might be catching them
+            try:
+                return_value = BasePreprocessRequest._http_client.post(
+                    url, content=body, headers=headers, timeout=BasePreprocessRequest._timeout)
+            except httpx.TimeoutException as ex:
+                raise RequestsTimeout(str(ex))
+            except httpx.TransportError as ex:
+                raise RequestsConnectionError(str(ex))
+        else:
+            return_value = BasePreprocessRequest._session.post(
+                url, data=body, headers=headers, timeout=BasePreprocessRequest._timeout)
+        if return_value.status_code >= 400:
             return None
-        return return_value.json()
+        return orjson.loads(return_value.content) if orjson else json.loads(return_value.content)
 
 
 @BasePreprocessRequest.register_engine("triton", modules=["grpc", "tritonclient"])
 class TritonPreprocessRequest(BasePreprocessRequest):
-    _content_lookup = {
-        np.uint8: 'uint_contents',
-        np.int8: 'int_contents',
-        np.int64: 'int64_contents',
-        np.uint64: 'uint64_contents',
-        np.int: 'int_contents',
-        np.uint: 'uint_contents',
-        np.bool: 'bool_contents',
-        np.float32: 'fp32_contents',
-        np.float64: 'fp64_contents',
-    }
     _default_grpc_address = "127.0.0.1:8001"
+    # micro-batching of concurrent requests into a single ModelInfer call, default 1 means disabled.
+    # If the `input_size` leading dimension is -1 (dynamic), requests are concatenated on it,
+    # otherwise requests are stacked on a new leading batch dimension (Triton model max_batch_size must be > 0)
+    _batch_max_size = int(os.environ.get("CLEARML_TRITON_BATCH_MAX_SIZE", 1))
+    _batch_max_wait_ms = float(os.environ.get("CLEARML_TRITON_BATCH_MAX_WAIT_MS", 2))
     _ext_grpc = None
     _ext_np_to_triton_dtype = None
     _ext_service_pb2 = None
@@ -222,6 +465,84 @@ class TritonPreprocessRequest(BasePreprocessRequest):
             self._ext_service_pb2 = service_pb2
             self._ext_service_pb2_grpc = service_pb2_grpc
 
+        # Create gRPC stub for communicating with the server, once per process (reused by all requests)
+        triton_server_address = self._server_config.get("triton_grpc_server") or self._default_grpc_address
+        if not triton_server_address:
+            raise ValueError("External Triton gRPC server is not configured!")
+        try:
+            self._grpc_channel = self._ext_grpc.insecure_channel(
+                triton_server_address,
+                options=[
+                    ("grpc.keepalive_time_ms", 20000),
+                    ("grpc.keepalive_timeout_ms", 5000),
+                    ("grpc.http2.max_pings_without_data", 0),
+                    ("grpc.max_receive_message_length", 256 * 1024 * 1024),
+                ]
+            )
+            self._grpc_stub = self._ext_service_pb2_grpc.GRPCInferenceServiceStub(self._grpc_channel)
+        except Exception as ex:
+            raise ValueError("External Triton gRPC server misconfigured [{}]: {}".format(triton_server_address, ex))
+
+        # compression is opt-in per endpoint, it is pure overhead for small (or incompressible) tensors
+        self._grpc_compression = {
+            "gzip": self._ext_grpc.Compression.Gzip,
+            "deflate": self._ext_grpc.Compression.Deflate,
+        }.get(self.model_endpoint.grpc_compression)
+
+        self._request_template = None
+        self._batch_queue = None
+        # the preprocess code implements its own `process`, nothing is sent from here
+        if self._proc_fn:
+            return
+        # missing endpoint input / output configuration, will raise on the first request
+        if not self.model_endpoint.input_size or not self.model_endpoint.input_name or \
+                not self.model_endpoint.output_name:
+            return
+
+        # Generate the request template, everything but the input payload is constant per endpoint
+        self._np_input_dtype = np.dtype(self.model_endpoint.input_type)
+        self._np_output_dtype = np.dtype(self.model_endpoint.output_type)
+        self._request_template = self._ext_service_pb2.ModelInferRequest()
+        self._request_template.model_name = "{}/{}".format(
+            self.model_endpoint.serving_url, self.model_endpoint.version).strip("/")
+        # we do not use the Triton model versions, we just assume a single version per endpoint
+        self._request_template.model_version = "1"
+
+        # Populate the inputs in inference request
+        input0 = self._request_template.InferInputTensor()
+        input0.name = self.model_endpoint.input_name
+        input_datatype = self._ext_np_to_triton_dtype(self._np_input_dtype.type)
+        # variable length types (BYTES) cannot be packed as raw fixed size elements
+        if not input_datatype or input_datatype == "BYTES":
+            raise ValueError("Input type not supported {}".format(self.model_endpoint.input_type))
+        input0.datatype = input_datatype
+        input0.shape.extend(self.model_endpoint.input_size)
+        self._request_template.inputs.extend([input0])
+
+        # Populate the outputs in the inference request
+        output0 = self._request_template.InferRequestedOutputTensor()
+        output0.name = self.model_endpoint.output_name
+        self._request_template.outputs.extend([output0])
+
+        # batched inputs are concatenated / stacked, so all dimensions (except a dynamic leading one) must be fixed
+        input_size = self.model_endpoint.input_size
+        self._batch_stack = input_size[0] != -1
+        if self._batch_max_size > 1 and all(d > 0 for d in input_size[1:]) and \
+                (input_size[0] > 0 or input_size[0] == -1):
+            self._batch_queue = _BatchQueue(
+                self._process_batch, max_batch=self._batch_max_size, max_wait_ms=self._batch_max_wait_ms,
+                timeout=self._timeout)
+
+    def close(self) -> None:
+        """
+        Stop the batching thread and close the gRPC channel to the Triton server
+        """
+        # waits for the queued requests to be sent, before closing the channel
+        if self._batch_queue is not None:
+            self._batch_queue.close()
+        self._grpc_channel.close()
+        super(TritonPreprocessRequest, self).close()
+
     def process(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Any:
         """
         The actual processing function.
@@ -237,73 +558,80 @@ class TritonPreprocessRequest(BasePreprocessRequest):
         :return: Object to be passed tp the post-processing function
         """
         # allow to override bt preprocessing class
-        if self._preprocess is not None and hasattr(self._preprocess, "process"):
-            return self._preprocess.process(data, collect_custom_statistics_fn)
+        if self._proc_fn:
+            return self._proc_fn(data, collect_custom_statistics_fn)
 
-        # Create gRPC stub for communicating with the server
-        triton_server_address = self._server_config.get("triton_grpc_server") or self._default_grpc_address
-        if not triton_server_address:
-            raise ValueError("External Triton gRPC server is not configured!")
-        try:
-            channel = self._ext_grpc.insecure_channel(triton_server_address)
-            grpc_stub = self._ext_service_pb2_grpc.GRPCInferenceServiceStub(channel)
-        except Exception as ex:
-            raise ValueError("External Triton gRPC server misconfigured [{}]: {}".format(triton_server_address, ex))
+        if self._request_template is None:
+            raise ValueError("Triton endpoint '{}' is missing input_size / input_name / output_name".format(
+                self.model_endpoint.serving_url))
 
-        # Generate the request
-        request = self._ext_service_pb2.ModelInferRequest()
-        request.model_name = "{}/{}".format(self.model_endpoint.serving_url, self.model_endpoint.version).strip("/")
-        # we do not use the Triton model versions, we just assume a single version per endpoint
-        request.model_version = "1"
+        # take the input data, no conversion copy if the preprocess returned a contiguous matrix of the input type
+        # shape errors are raised here, only failing the request that caused them (not the entire batch)
+        input_data = np.ascontiguousarray(data, dtype=self._np_input_dtype).reshape(self.model_endpoint.input_size)
 
-        # take the input data
-        input_data = np.array(data, dtype=self.model_endpoint.input_type)
+        if self._batch_queue is not None:
+            return self._batch_queue.submit(input_data)
 
-        # Populate the inputs in inference request
-        input0 = request.InferInputTensor()
-        input0.name = self.model_endpoint.input_name
-        input_dtype = np.dtype(self.model_endpoint.input_type).type
-        input0.datatype = self._ext_np_to_triton_dtype(input_dtype)
-        input0.shape.extend(self.model_endpoint.input_size)
+        output_results = self._send_request(input_data)
+        # if we have a single matrix, return it as is
+        return output_results[0] if len(output_results) == 1 else output_results
 
-        # to be inferred
-        input_func = self._content_lookup.get(input_dtype)
-        if not input_func:
-            raise ValueError("Input type nt supported {}".format(input_dtype))
-        input_func = getattr(input0.contents, input_func)
-        input_func[:] = input_data.flatten()
+    def _process_batch(self, batch: List[np.ndarray]) -> List[Any]:
+        """
+        Send a list of input matrices (already reshaped to `input_size`) as a single Triton inference request.
+        Inputs are stacked on a new leading batch dimension, or concatenated on the `input_size` leading
+        dimension if it is dynamic (-1), and the outputs are split back (in the same order) per input.
 
-        # push into request
-        request.inputs.extend([input0])
+        :param batch: list of input matrices (already cast to the endpoint input type)
+        :return: list of results, one per input matrix
+        """
+        if self._batch_stack:
+            # row i of every output belongs to request i
+            output_results = self._send_request(np.stack(batch, axis=0))
+        else:
+            output_results = self._send_request(np.concatenate(batch, axis=0) if len(batch) > 1 else batch[0])
+            # split the batched outputs back per request (requests might have a different number of rows)
+            offsets = np.cumsum([d.shape[0] for d in batch[:-1]])
+            output_results = [np.split(o, offsets, axis=0) for o in output_results]
 
-        # Populate the outputs in the inference request
-        output0 = request.InferRequestedOutputTensor()
-        output0.name = self.model_endpoint.output_name
+        results = [[o[i] for o in output_results] for i in range(len(batch))]
+        # if we have a single matrix, return it as is
+        return [r[0] if len(r) == 1 else r for r in results]
+
+    def _send_request(self, input_data: np.ndarray) -> List[np.ndarray]:
+        """
+        Send a single inference request to the Triton server
+
+        :param input_data: input matrix, its shape is sent as the input tensor shape
+        :return: list of output matrices
+        """
+        request = self._ext_service_pb2.ModelInferRequest()
+        request.CopyFrom(self._request_template)
+        request.inputs[0].shape[:] = input_data.shape
+
+        # to be inferred, packed as raw bytes (single memory copy, instead of the typed repeated contents fields)
+        request.raw_input_contents.append(input_data.tobytes())
 
-        request.outputs.extend([output0])
-        response = grpc_stub.ModelInfer(
+        response = self._grpc_stub.ModelInfer(
             request,
-            compression=self._ext_grpc.Compression.Gzip,
+            compression=self._grpc_compression,
             timeout=self._timeout
         )
 
         output_results = []
         index = 0
         for output in response.outputs:
-            shape = []
-            for value in output.shape:
-                shape.append(value)
+            # zero-copy view, raises if the returned buffer does not match the output shape
             output_results.append(
-                np.frombuffer(response.raw_output_contents[index], dtype=self.model_endpoint.output_type))
-            output_results[-1] = np.resize(output_results[-1], shape)
+                np.frombuffer(response.raw_output_contents[index], dtype=self._np_output_dtype).reshape(
+                    tuple(output.shape)))
             index += 1
 
-        # if we have a single matrix, return it as is
-        return output_results[0] if index == 1 else output_results
+        return output_results
 
 
 @BasePreprocessRequest.register_engine("sklearn", modules=["joblib", "sklearn"])
-class SKLearnPreprocessRequest(BasePreprocessRequest):
+class SKLearnPreprocessRequest(_BatchRunner, BasePreprocessRequest):
     def __init__(self, model_endpoint: ModelEndpoint, task: Task = None):
         super(SKLearnPreprocessRequest, self).__init__(
             model_endpoint=model_endpoint, task=task)
@@ -311,36 +639,53 @@ class SKLearnPreprocessRequest(BasePreprocessRequest):
             # get model
             import joblib  # noqa
             self._model = joblib.load(filename=self._get_local_model_file())
+        self._init_batch_runner()
 
     def process(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Any:
         """
         The actual processing function.
         We run the model in this context
         """
-        return self._model.predict(data)
+        return self._batch_predict(data)
 
 
 @BasePreprocessRequest.register_engine("xgboost", modules=["xgboost"])
-class XGBoostPreprocessRequest(BasePreprocessRequest):
+class XGBoostPreprocessRequest(_BatchRunner, BasePreprocessRequest):
+    _ext_xgboost = None
+
     def __init__(self, model_endpoint: ModelEndpoint, task: Task = None):
         super(XGBoostPreprocessRequest, self).__init__(
             model_endpoint=model_endpoint, task=task)
+        if self._ext_xgboost is None:
+            import xgboost  # noqa
+            self._ext_xgboost = xgboost
         if self._model is None:
             # get model
-            import xgboost  # noqa
-            self._model = xgboost.Booster()
+            self._model = self._ext_xgboost.Booster()
             self._model.load_model(self._get_local_model_file())
+        self._init_batch_runner()
+
+    def _get_num_features(self) -> Optional[int]:
+        if isinstance(self._model, self._ext_xgboost.Booster):
+            return self._model.num_features()
+        return super(XGBoostPreprocessRequest, self)._get_num_features()
+
+    def _predict(self, data: Any) -> Any:
+        # Booster expects a DMatrix, build it once per (batched) matrix
+        if isinstance(data, np.ndarray) and isinstance(self._model, self._ext_xgboost.Booster):
+            data = self._ext_xgboost.DMatrix(data)
+        return self._model.predict(data)
 
     def process(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Any:
         """
         The actual processing function.
         We run the model in this context
         """
-        return self._model.predict(data)
+        return self._batch_predict(data)
 
 
 @BasePreprocessRequest.register_engine("lightgbm", modules=["lightgbm"])
-class LightGBMPreprocessRequest(BasePreprocessRequest):
+class LightGBMPreprocessRequest(_BatchRunner, BasePreprocessRequest):
     def __init__(self, model_endpoint: ModelEndpoint, task: Task = None):
         super(LightGBMPreprocessRequest, self).__init__(
             model_endpoint=model_endpoint, task=task)
@@ -348,13 +693,19 @@ class LightGBMPreprocessRequest(BasePreprocessRequest):
             # get model
             import lightgbm  # noqa
             self._model = lightgbm.Booster(model_file=self._get_local_model_file())
+        self._init_batch_runner()
+
+    def _get_num_features(self) -> Optional[int]:
+        if callable(getattr(self._model, "num_feature", None)):
+            return self._model.num_feature()
+        return super(LightGBMPreprocessRequest, self)._get_num_features()
 
     def process(self, data: Any, collect_custom_statistics_fn: Callable[[dict], None] = None) -> Any:
         """
         The actual processing function.
         We run the model in this context
         """
-        return self._model.predict(data)
+        return self._batch_predict(data)
 
 
 @BasePreprocessRequest.register_engine("custom")
@@ -368,6 +719,4 @@ class CustomPreprocessRequest(BasePreprocessRequest):
         The actual processing function.
         We run the process in this context
         """
-        if self._preprocess is not None and hasattr(self._preprocess, 'process'):
-            return self._preprocess.process(data, collect_custom_statistics_fn)
-        return None
+        return self._proc_fn(data, collect_custom_statistics_fn) if self._proc_fn else None